@@ -1,12 +1,18 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import numpy as np
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import time
 from streamlit_option_menu import option_menu
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import base64
+from urllib.parse import urlencode
+# plotly is imported inside the chart functions, so pages without charts never load it
 
 # Page configuration
 st.set_page_config(
@@ -19,8 +25,11 @@ st.set_page_config(
 # API Base URL
 API_BASE = "http://localhost:5001/api"
 
+# (connect, read) timeout for reads - fail fast when the backend is unreachable
+REQUEST_TIMEOUT = (2, 5)
+
 # Custom CSS with EPCET branding and better readability
-st.markdown("""
+CSS = """
 <style>
     /* Main styling */
     .main-header {
@@ -130,9 +139,17 @@ st.markdown("""
         background: #A23B72;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Streamlit drops elements that are not re-emitted, so the styles go out on every run
+st.markdown(CSS, unsafe_allow_html=True)
+
+# Page heading markup
+HEADER_BRAND = '<div class="epcet-brand">🏛️ EPCET LIBRARY MANAGEMENT SYSTEM</div>'
+SUBHEADER = '<div class="sub-header">{}</div>'.format
 
-# Function to load EPCET logo
+# Function to load EPCET logo (read from disk once per process)
+@st.cache_resource
 def load_epcet_logo():
     try:
         with open("epcet-logo.svg", "r") as file:
@@ -155,30 +172,100 @@ def load_epcet_logo():
 # Load EPCET logo
 EPCET_LOGO = load_epcet_logo()
 
+# Sidebar markup and navigation styles
+SIDEBAR_HEADER_HTML = f"""
+        <div style="text-align: center; padding: 1rem 0; background: rgba(255,255,255,0.1); border-radius: 10px; margin-bottom: 1rem;">
+            {EPCET_LOGO}
+            <h2 style="color: white; margin: 0.5rem 0 0 0; font-size: 1.2rem;">EPCET Library</h2>
+            <p style="color: #d0d0d0; font-size: 0.9rem; margin: 0;">Management System</p>
+        </div>
+            
+        """
+
+SIDEBAR_FOOTER_HTML = """
+        <div style="text-align: center; color: #e0e0e0; font-size: 0.8rem; padding: 1rem 0;">
+            <p><strong>EPCET Library Management System</strong></p>
+            <p>Version 2.0</p>
+            <p style="font-size: 0.7rem; color: #b0b0b0;">© 2024 All Rights Reserved</p>
+        </div>
+        """
+
+NAV_STYLES = {
+    "container": {"padding": "5px", "background-color": "transparent"},
+    "icon": {"color": "white", "font-size": "16px"}, 
+    "nav-link": {
+        "font-size": "15px",
+        "text-align": "left",
+        "margin": "3px",
+        "color": "white",
+        "border-radius": "8px",
+        "padding": "10px 15px"
+    },
+    "nav-link-selected": {
+        "background-color": "rgba(255, 255, 255, 0.2)",
+        "color": "white",
+        "font-weight": "bold",
+        "border": "1px solid rgba(255, 255, 255, 0.3)"
+    },
+    "menu-title": {
+        "color": "white",
+        "font-weight": "bold",
+        "font-size": "16px"
+    }
+}
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_get(_session, url):
+    """GET a URL and memoize the JSON body across reruns"""
+    response = _session.get(url, timeout=REQUEST_TIMEOUT)
+    # Raise on failure so error responses are never cached
+    response.raise_for_status()
+    return response.json()
+
 class LibraryAPI:
     def __init__(self, base_url):
         self.base_url = base_url
+        # Keep-alive session so calls reuse one connection instead of reconnecting
+        self.session = requests.Session()
+        # Room for the parallel_fetch workers to each hold a pooled connection,
+        # plus a couple of quick retries for dropped keep-alive connections. Only
+        # connecting is retried: a read timeout means the backend got the request,
+        # and resending it would just repeat a slow aggregation
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20,
+                              max_retries=Retry(total=2, connect=2, read=False, backoff_factor=0.2))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # The health probe has to fail fast, so it is never retried (longest prefix wins)
+        self.session.mount(f'{base_url}/health', HTTPAdapter(max_retries=0))
     
-    def _make_request(self, endpoint, method='GET', data=None):
+    def _make_request(self, endpoint, method='GET', data=None, cache=True, invalidates=(), timeout=REQUEST_TIMEOUT):
         try:
             url = f"{self.base_url}{endpoint}"
             if method == 'GET':
-                response = requests.get(url, timeout=10)
+                if cache:
+                    return cached_get(self.session, url)
+                response = self.session.get(url, timeout=timeout)
             elif method == 'POST':
-                response = requests.post(url, json=data, timeout=10)
+                response = self.session.post(url, json=data, timeout=10)
             elif method == 'PUT':
-                response = requests.put(url, json=data, timeout=10)
+                response = self.session.put(url, json=data, timeout=10)
             elif method == 'DELETE':
-                response = requests.delete(url, timeout=10)
+                response = self.session.delete(url, timeout=10)
+            
+            if method != 'GET':
+                # Raw responses are keyed by URL and can't be cleared selectively,
+                # but only the DataFrame loaders this mutation touches are dropped
+                cached_get.clear()
+                for loader in invalidates:
+                    loader.clear()
+                forget_session_fetches()
             
             if response.status_code == 200:
                 return response.json()
             else:
-                error_msg = response.json().get('error', 'Unknown error')
-                st.error(f"API Error ({response.status_code}): {error_msg}")
-                # Log the full response for debugging
-                print(f"Full error response: {response.text}")
-                return None
+                return self._api_error(response)
+        except requests.exceptions.HTTPError as e:
+            return self._api_error(e.response)
         except requests.exceptions.ConnectionError:
             st.error("❌ Cannot connect to the server. Please make sure the backend is running.")
             return None
@@ -190,42 +277,53 @@ class LibraryAPI:
             print(f"Detailed error: {e}")
             return None
     
+    def _api_error(self, response):
+        # Proxies and crashed upstreams answer with HTML rather than the API's JSON
+        try:
+            error_msg = response.json().get('error', 'Unknown error')
+        except ValueError:
+            # Keep the page readable; the body itself is printed below
+            error_msg = response.reason or 'Unknown error'
+        st.error(f"API Error ({response.status_code}): {error_msg}")
+        # Log the full response for debugging
+        print(f"Full error response: {response.text}")
+        return None
+    
+    def _get(self, endpoint, cache=True, **params):
+        # Drop unset filters and let urlencode escape the rest
+        query = urlencode({k: v for k, v in params.items() if v not in (None, '', 'all')})
+        return self._make_request(f'{endpoint}?{query}' if query else endpoint, cache=cache)
+    
     def get_health(self):
-        return self._make_request('/health')
+        # Never cached so the connection status stays live; a short timeout
+        # keeps a dead backend from stalling the sidebar
+        return self._make_request('/health', cache=False, timeout=2)
     
     # Books
     def get_books(self, page=1, limit=50, search="", category=""):
-        params = f"?page={page}&limit={limit}"
-        if search:
-            params += f"&search={search}"
-        if category:
-            params += f"&category={category}"
-        return self._make_request(f'/books{params}')
+        return self._get('/books', page=page, limit=limit, search=search, category=category)
     
     def get_book_categories(self):
         return self._make_request('/books/categories')
     
     def add_book(self, book_data):
-        return self._make_request('/books', 'POST', book_data)
+        return self._make_request('/books', 'POST', book_data, invalidates=(books_df,))
     
     def update_book(self, book_id, book_data):
-        return self._make_request(f'/books/{book_id}', 'PUT', book_data)
+        return self._make_request(f'/books/{book_id}', 'PUT', book_data, invalidates=(books_df,))
     
     def delete_book(self, book_id):
-        return self._make_request(f'/books/{book_id}', 'DELETE')
+        return self._make_request(f'/books/{book_id}', 'DELETE', invalidates=(books_df,))
     
     # Users
     def get_users(self, page=1, limit=50, user_type=""):
-        params = f"?page={page}&limit={limit}"
-        if user_type:
-            params += f"&userType={user_type}"
-        return self._make_request(f'/users{params}')
+        return self._get('/users', page=page, limit=limit, userType=user_type)
     
     def get_user_types(self):
         return self._make_request('/users/types')
     
     def add_user(self, user_data):
-        return self._make_request('/users', 'POST', user_data)
+        return self._make_request('/users', 'POST', user_data, invalidates=(users_df,))
     
     # Transactions
     def borrow_book(self, book_id, user_id, days=14):
@@ -233,18 +331,15 @@ class LibraryAPI:
             'bookId': book_id,
             'userId': user_id,
             'days': days
-        })
+        }, invalidates=(books_df, transactions_df, overdue_df))
     
     def return_book(self, transaction_id):
         return self._make_request('/transactions/return', 'POST', {
             'transactionId': transaction_id
-        })
+        }, invalidates=(books_df, transactions_df, overdue_df))
     
     def get_transactions(self, page=1, limit=50, status=""):
-        params = f"?page={page}&limit={limit}"
-        if status:
-            params += f"&status={status}"
-        return self._make_request(f'/transactions{params}')
+        return self._get('/transactions', page=page, limit=limit, status=status)
     
     def get_overdue_transactions(self):
         return self._make_request('/transactions/overdue')
@@ -253,40 +348,286 @@ class LibraryAPI:
     def get_dashboard_stats(self):
         return self._make_request('/analytics/dashboard')
     
+    # The aggregates are only read through their st.cache_data loaders, which do
+    # the caching, so they skip the raw GET cache and a refresh clears one place
     def get_most_borrowed(self, limit=10, period="all"):
-        return self._make_request(f'/analytics/most-borrowed?limit={limit}&period={period}')
+        return self._get('/analytics/most-borrowed', cache=False, limit=limit, period=period)
     
     def get_user_categories(self):
-        return self._make_request('/analytics/user-categories')
+        return self._make_request('/analytics/user-categories', cache=False)
     
     def get_reading_patterns(self):
-        return self._make_request('/analytics/reading-patterns')
+        return self._make_request('/analytics/reading-patterns', cache=False)
     
     def get_monthly_report(self, year=datetime.now().year):
-        return self._make_request(f'/analytics/monthly-report?year={year}')
+        return self._get('/analytics/monthly-report', cache=False, year=year)
+
+# Initialize API - one client (and connection pool) for the whole server process
+@st.cache_resource
+def get_api():
+    return LibraryAPI(API_BASE)
+
+api = get_api()
+
+class APIError(Exception):
+    """Raised inside cached loaders so failed API calls are never memoized"""
+
+def _frame(response):
+    if response and response.get('success'):
+        return pd.DataFrame(response['data'])
+    raise APIError()
+
+# Cached DataFrame loaders - st.cache_data hands every caller its own copy
+@st.cache_data(ttl=60, show_spinner=False)
+def books_df():
+    return _frame(api.get_books(limit=100))
+
+@st.cache_data(ttl=60, show_spinner=False)
+def users_df():
+    return _frame(api.get_users(limit=100))
+
+@st.cache_data(ttl=60, show_spinner=False)
+def transactions_df(status=""):
+    return _frame(api.get_transactions(status=status, limit=100))
+
+@st.cache_data(ttl=60, show_spinner=False)
+def overdue_df():
+    """Every open loan past its due date, most overdue first"""
+    # Flagged loans come from the unbounded overdue endpoint; loans not yet flagged
+    # are paged out of the borrowed listing, which is capped and newest-first
+    frames = [_frame(api.get_overdue_transactions())]
+    page, total_pages = 1, 1
+    while page <= total_pages:
+        response = api.get_transactions(page=page, limit=100, status="borrowed")
+        frames.append(_frame(response))
+        total_pages = response.get('pagination', {}).get('totalPages', 1)
+        page += 1
+    df = overdue_loans(pd.concat(frames, ignore_index=True))
+    if df.empty:
+        return df
+    return df.sort_values('dueDate', key=lambda due: pd.to_datetime(due, utc=True), ignore_index=True)
+
+def _checked(response):
+    if response is None:
+        raise APIError()
+    return response
+
+# Analytics aggregates change slowly, so they are kept longer than the listings
+@st.cache_data(ttl=300, show_spinner=False)
+def _get_most_borrowed(limit, period):
+    return _checked(api.get_most_borrowed(limit=limit, period=period))
 
-# Initialize API
-api = LibraryAPI(API_BASE)
+@st.cache_data(ttl=300, show_spinner=False)
+def _get_user_categories():
+    return _checked(api.get_user_categories())
+
+# The chart views get their frames, month labels included, straight from the cache
+@st.cache_data(ttl=300, show_spinner=False)
+def reading_patterns_df():
+    df = _frame(api.get_reading_patterns())
+    if not df.empty:
+        month_names = np.array(['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
+                                'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'])
+        ids = df['_id'].to_numpy()
+        in_range = (ids >= 1) & (ids <= 12)
+        df['Month'] = np.where(in_range, month_names[np.clip(ids, 1, 12) - 1],
+                               np.char.add('Month ', ids.astype(str)))
+    return df
+
+@st.cache_data(ttl=300, show_spinner=False)
+def monthly_report_df(year):
+    df = _frame(api.get_monthly_report(year=year))
+    if not df.empty:
+        month_names = np.array(['January', 'February', 'March', 'April', 'May', 'June',
+                                'July', 'August', 'September', 'October', 'November', 'December'])
+        df['Month'] = month_names[df['month'].to_numpy() - 1]
+    return df
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _get_health():
+    return _checked(api.get_health())
+
+def load_cached(loader, *args):
+    """Call a cached loader, returning None if its API call failed"""
+    try:
+        return loader(*args)
+    except APIError:
+        return None
 
 def check_connection():
     """Check if backend is connected"""
-    health = api.get_health()
+    health = load_cached(_get_health)
     if health and health.get('status') == 'OK':
         return True
     return False
 
+def cached_check_connection():
+    """check_connection() remembered per session, backing off while the backend is down"""
+    now = time.monotonic()
+    state = st.session_state.setdefault('_conn', {'ok': None, 'next': 0, 'delay': 1})
+    if now < state['next']:
+        return state['ok']
+    ok = check_connection()
+    state['ok'] = ok
+    if ok:
+        state['next'] = now + 5
+        state['delay'] = 1
+    else:
+        # Retry after 1s, 2s, 4s ... capped at 30s
+        state['next'] = now + state['delay']
+        state['delay'] = min(state['delay'] * 2, 30)
+    return ok
+
+def parallel_fetch(calls):
+    """Run independent API calls concurrently and return their results in order"""
+    ctx = get_script_run_ctx()
+    
+    def run(call):
+        # Worker threads need the script context to use st.* and the cache
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return call()
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        return list(executor.map(run, calls))
+
+def overdue_loans(df_open):
+    """Open loans past their due date, with whole days overdue (rounded up, as the backend fines)"""
+    if df_open.empty:
+        return df_open
+    df_open = df_open.copy()
+    late_by = pd.Timestamp.now(tz='UTC') - pd.to_datetime(df_open['dueDate'], utc=True)
+    df_open['overdueDays'] = late_by.dt.ceil('D').dt.days
+    return df_open[df_open['overdueDays'] > 0]
+
+def flatten_txn(df, columns, fill_value=''):
+    """Turn raw transaction records into the display columns in one vectorized pass"""
+    df = df.copy()
+    df['Book'] = df['bookId'].map(lambda d: d.get('title', 'Unknown') if isinstance(d, dict) else 'Unknown')
+    df['User'] = df['userId'].map(lambda d: d.get('name', 'Unknown') if isinstance(d, dict) else 'Unknown')
+    df = df.rename(columns={
+        'transactionId': 'Transaction ID',
+        'status': 'Status',
+        'borrowDate': 'Borrow Date',
+        'dueDate': 'Due Date',
+        'returnDate': 'Return Date',
+        'overdueDays': 'Overdue Days'
+    })
+    return df.reindex(columns=columns, fill_value=fill_value)
+
+SESSION_FETCH_TTL = 60
+
+def session_fetch(name, key, fetch, force=False):
+    """Reuse the response stored under ``name`` until ``key`` changes, it expires or ``force`` is set"""
+    cached = st.session_state.get(name)
+    if force or cached is None or cached[0] != key or time.monotonic() - cached[1] > SESSION_FETCH_TTL:
+        response = fetch()
+        if response is None:
+            # Failed calls are retried on the next run rather than remembered
+            return None
+        cached = st.session_state[name] = (key, time.monotonic(), response)
+    return cached[2]
+
+def refresh_button(key, *caches):
+    """Refresh button for a view; a click drops the given loaders' cached results"""
+    if st.button("🔄 Refresh", key=key):
+        for cache in caches:
+            cache.clear()
+
+def forget_session_fetches():
+    """Drop every response stored by session_fetch()"""
+    for name in [name for name in st.session_state if name.startswith('_fetch_')]:
+        del st.session_state[name]
+
+def kept_key(key, default):
+    """Widget key whose value outlives the widget not being rendered
+
+    Streamlit drops a widget's state on any run that doesn't render it, so the
+    value is mirrored under a plain key and seeded back before the widget is built.
+    """
+    kept = f'_kept_{key}'
+    if key not in st.session_state:
+        st.session_state[key] = st.session_state.get(kept, default)
+    st.session_state[kept] = st.session_state[key]
+    return key
+
+def flash(message, kind='success'):
+    """Queue a message to show on the next run, so mutations can rerun right away"""
+    st.session_state.setdefault('_flash', []).append((kind, message))
+
+def show_flash():
+    """Render and clear the messages queued by flash()"""
+    for kind, message in st.session_state.pop('_flash', []):
+        if kind == 'success':
+            st.markdown(f'<div class="success-message">{message}</div>', unsafe_allow_html=True)
+        else:
+            getattr(st, kind)(message)
+
+# Charts here are read, not explored, so skip the modebar toolbar
+PLOTLY_CONFIG = {'displayModeBar': False, 'responsive': True}
+
+RESAMPLE_THRESHOLD = 500
+
+def resampled(fig, n_points):
+    """Downsample long series server-side so the browser only gets ~1500 points per trace"""
+    if n_points <= RESAMPLE_THRESHOLD:
+        return fig
+    try:
+        from plotly_resampler import FigureResampler
+    except ImportError:  # optional - only needed once a chart grows past RESAMPLE_THRESHOLD points
+        return fig
+    return FigureResampler(fig, default_n_shown_samples=1500)
+
+def category_colors(n):
+    """One colour per bar from Plotly's default palette, as px.bar(color=...) would give"""
+    from plotly.colors import qualitative
+    palette = qualitative.Plotly
+    return [palette[i % len(palette)] for i in range(n)]
+
+@st.fragment
+def _dashboard_charts(stats_data):
+    """Dashboard charts, only built once the user asks for them"""
+    # An expander still runs its body when collapsed, so a toggle gates the work
+    if not st.toggle("📊 Show charts", value=False):
+        return
+    import plotly.graph_objects as go
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Popular Categories
+        categories_data = stats_data['popularCategories']
+        if categories_data:
+            df_categories = pd.DataFrame(categories_data)
+            fig_categories = go.Figure(go.Pie(labels=df_categories['_id'].tolist(),
+                                              values=df_categories['count'].tolist()))
+            fig_categories.update_layout(title='📚 Popular Book Categories')
+            st.plotly_chart(fig_categories, use_container_width=True, config=PLOTLY_CONFIG)
+    
+    with col2:
+        # User Type Stats
+        user_stats = stats_data['userTypeStats']
+        if user_stats:
+            df_users = pd.DataFrame(user_stats)
+            fig_users = go.Figure(go.Bar(x=df_users['_id'].tolist(), y=df_users['count'].tolist(),
+                                         marker_color=category_colors(len(df_users))))
+            fig_users.update_layout(title='👥 Borrowing by User Type')
+            st.plotly_chart(fig_users, use_container_width=True, config=PLOTLY_CONFIG)
+
 def main_page():
     """Main Dashboard"""
-    st.markdown('<div class="epcet-brand">🏛️ EPCET LIBRARY MANAGEMENT SYSTEM</div>', unsafe_allow_html=True)
+    st.markdown(HEADER_BRAND, unsafe_allow_html=True)
     
-    if not check_connection():
+    if not cached_check_connection():
         st.error("🔌 Backend server is not connected. Please make sure the server is running on localhost:5001")
         return
     
     # Dashboard Stats
-    st.markdown('<div class="sub-header">📊 Dashboard Overview</div>', unsafe_allow_html=True)
+    st.markdown(SUBHEADER("📊 Dashboard Overview"), unsafe_allow_html=True)
     
-    stats = api.get_dashboard_stats()
+    stats, transactions = parallel_fetch([
+        api.get_dashboard_stats,
+        lambda: api.get_transactions(limit=10)
+    ])
     if stats and stats.get('success'):
         data = stats['data']['overview']
         
@@ -306,31 +647,11 @@ def main_page():
             st.metric("Overdue Books", data['overdueBooks'])
         
         # Charts
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Popular Categories
-            categories_data = stats['data']['popularCategories']
-            if categories_data:
-                df_categories = pd.DataFrame(categories_data)
-                fig_categories = px.pie(df_categories, values='count', names='_id', 
-                                      title='📚 Popular Book Categories')
-                st.plotly_chart(fig_categories, use_container_width=True)
-        
-        with col2:
-            # User Type Stats
-            user_stats = stats['data']['userTypeStats']
-            if user_stats:
-                df_users = pd.DataFrame(user_stats)
-                fig_users = px.bar(df_users, x='_id', y='count', 
-                                 title='👥 Borrowing by User Type',
-                                 color='_id')
-                st.plotly_chart(fig_users, use_container_width=True)
+        _dashboard_charts(stats['data'])
         
         # Recent Activity
-        st.markdown('<div class="sub-header">🔄 Recent Activity</div>', unsafe_allow_html=True)
+        st.markdown(SUBHEADER("🔄 Recent Activity"), unsafe_allow_html=True)
         
-        transactions = api.get_transactions(limit=10)
         if transactions and transactions.get('success'):
             df_transactions = pd.DataFrame(transactions['data'])
             if not df_transactions.empty:
@@ -343,143 +664,180 @@ def main_page():
                 
                 st.dataframe(display_df, use_container_width=True)
 
-def books_management():
-    """Books Management Page"""
-    st.markdown('<div class="sub-header">📖 Books Management</div>', unsafe_allow_html=True)
+@st.fragment
+def _view_books_tab(df_books):
+    """View Books tab"""
+    st.subheader("All Books")
+    if not df_books.empty:
+        st.dataframe(df_books, use_container_width=True)
+
+@st.fragment
+def _add_book_tab():
+    """Add New Book tab"""
+    st.subheader("Add New Book")
     
-    tab1, tab2, tab3, tab4 = st.tabs(["View Books", "Add New Book", "Search Books", "Update/Delete Books"])
+    with st.form("add_book_form"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            title = st.text_input("Title*")
+            author = st.text_input("Author*")
+            category = st.text_input("Category*")
+            isbn = st.text_input("ISBN")
+        
+        with col2:
+            total_copies = st.number_input("Total Copies*", min_value=1, value=1)
+            published_year = st.number_input("Published Year", min_value=1000, max_value=datetime.now().year)
+            description = st.text_area("Description")
+        
+        submitted = st.form_submit_button("Add Book")
+        
+        if submitted:
+            if title and author and category:
+                book_data = {
+                    'title': title,
+                    'author': author,
+                    'category': category,
+                    'isbn': isbn if isbn else None,
+                    'totalCopies': total_copies,
+                    'availableCopies': total_copies,
+                    'publishedYear': published_year if published_year else None,
+                    'description': description if description else None
+                }
+                
+                result = api.add_book(book_data)
+                if result and result.get('success'):
+                    flash("✅ Book added successfully!")
+                    st.rerun()
+            else:
+                st.error("Please fill in all required fields (*)")
+
+@st.fragment
+def _search_books_tab():
+    """Search Books tab"""
+    st.subheader("Search Books")
     
-    with tab1:
-        st.subheader("All Books")
-        books = api.get_books(limit=100)
+    categories_response = api.get_book_categories()
+    category_options = [""] + (categories_response['data'] if categories_response and categories_response.get('success') else [])
+    
+    # Only query the backend when the search is actually submitted
+    with st.form("search_books_form"):
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            search_query = st.text_input("Search by title, author, or category")
+        with col2:
+            category_filter = st.selectbox("Category", category_options)
+        submitted = st.form_submit_button("Search")
+    
+    if submitted:
+        st.session_state['_search_terms'] = (search_query, category_filter)
+    search_query, category_filter = st.session_state.get('_search_terms', ("", ""))
+    
+    if search_query or category_filter:
+        books = session_fetch('_fetch_search', (search_query, category_filter),
+                              lambda: api.get_books(search=search_query, category=category_filter, limit=100))
         if books and books.get('success'):
             df_books = pd.DataFrame(books['data'])
             if not df_books.empty:
                 st.dataframe(df_books, use_container_width=True)
+            else:
+                st.info("No books found matching your search criteria.")
+
+@st.fragment
+def _update_delete_books_tab():
+    """Update/Delete Books tab"""
+    st.subheader("Update or Delete Books")
     
-    with tab2:
-        st.subheader("Add New Book")
+    # Only request the page of books the selector offers
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.number_input("Page size", min_value=5, max_value=100, value=25, step=5)
+    with col2:
+        page = st.number_input("Page", min_value=1, value=1)
+    
+    books = api.get_books(page=page, limit=page_size)
+    if books and books.get('success') and books['data']:
+        # Book selection - label -> record, so picking a book is a dict lookup
+        books_by_label = {}
+        for book in books['data']:
+            books_by_label.setdefault(f"{book['title']} by {book['author']}", book)
+        selected_book = st.selectbox("Select Book to Edit", list(books_by_label))
         
-        with st.form("add_book_form"):
+        if selected_book:
+            book_data = books_by_label[selected_book]
+            
             col1, col2 = st.columns(2)
             
             with col1:
-                title = st.text_input("Title*")
-                author = st.text_input("Author*")
-                category = st.text_input("Category*")
-                isbn = st.text_input("ISBN")
+                st.write("**Current Details:**")
+                st.write(f"Title: {book_data['title']}")
+                st.write(f"Author: {book_data['author']}")
+                st.write(f"Category: {book_data['category']}")
+                st.write(f"Available: {book_data['availableCopies']}/{book_data['totalCopies']}")
             
             with col2:
-                total_copies = st.number_input("Total Copies*", min_value=1, value=1)
-                published_year = st.number_input("Published Year", min_value=1000, max_value=datetime.now().year)
-                description = st.text_area("Description")
-            
-            submitted = st.form_submit_button("Add Book")
-            
-            if submitted:
-                if title and author and category:
-                    book_data = {
-                        'title': title,
-                        'author': author,
-                        'category': category,
-                        'isbn': isbn if isbn else None,
-                        'totalCopies': total_copies,
-                        'availableCopies': total_copies,
-                        'publishedYear': published_year if published_year else None,
-                        'description': description if description else None
-                    }
+                st.write("**Update Book:**")
+                with st.form("update_book_form"):
+                    new_total = st.number_input("Total Copies", min_value=1, value=int(book_data['totalCopies']))
+                    new_available = st.number_input("Available Copies", min_value=0, max_value=new_total, 
+                                                  value=int(book_data['availableCopies']))
+                    update_submitted = st.form_submit_button("Update Book")
                     
-                    result = api.add_book(book_data)
+                    if update_submitted:
+                        update_data = {
+                            'totalCopies': new_total,
+                            'availableCopies': new_available
+                        }
+                        result = api.update_book(book_data['_id'], update_data)
+                        if result and result.get('success'):
+                            flash("✅ Book updated successfully!")
+                            st.rerun()
+            
+            # Delete option
+            if st.button("❌ Delete Book", type="secondary"):
+                if st.warning("Are you sure you want to delete this book?"):
+                    result = api.delete_book(book_data['_id'])
                     if result and result.get('success'):
-                        st.markdown('<div class="success-message">✅ Book added successfully!</div>', unsafe_allow_html=True)
-                        time.sleep(2)
+                        flash("✅ Book deleted successfully!")
                         st.rerun()
-                else:
-                    st.error("Please fill in all required fields (*)")
+    elif books and books.get('success'):
+        # Paged past the end of the catalogue
+        total_pages = books.get('pagination', {}).get('totalPages', 0)
+        st.info(f"No books on this page. There are {total_pages} page(s) at this page size.")
+
+def books_management():
+    """Books Management Page"""
+    st.markdown(SUBHEADER("📖 Books Management"), unsafe_allow_html=True)
+    
+    # Fetch the catalogue once for the View tab
+    df_books = load_cached(books_df)
+    if df_books is None:
+        df_books = pd.DataFrame()
+    
+    tab1, tab2, tab3, tab4 = st.tabs(["View Books", "Add New Book", "Search Books", "Update/Delete Books"])
+    
+    with tab1:
+        _view_books_tab(df_books)
+    
+    with tab2:
+        _add_book_tab()
     
     with tab3:
-        st.subheader("Search Books")
-        
-        col1, col2 = st.columns([3, 1])
-        with col1:
-            search_query = st.text_input("Search by title, author, or category")
-        with col2:
-            categories_response = api.get_book_categories()
-            category_options = [""] + (categories_response['data'] if categories_response and categories_response.get('success') else [])
-            category_filter = st.selectbox("Category", category_options)
-        
-        if search_query or category_filter:
-            books = api.get_books(search=search_query, category=category_filter, limit=100)
-            if books and books.get('success'):
-                df_books = pd.DataFrame(books['data'])
-                if not df_books.empty:
-                    st.dataframe(df_books, use_container_width=True)
-                else:
-                    st.info("No books found matching your search criteria.")
+        _search_books_tab()
     
     with tab4:
-        st.subheader("Update or Delete Books")
-        
-        books = api.get_books(limit=100)
-        if books and books.get('success'):
-            df_books = pd.DataFrame(books['data'])
-            if not df_books.empty:
-                # Book selection
-                book_options = df_books['title'] + " by " + df_books['author']
-                selected_book = st.selectbox("Select Book to Edit", book_options)
-                
-                if selected_book:
-                    book_index = df_books[book_options == selected_book].index[0]
-                    book_data = df_books.iloc[book_index]
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.write("**Current Details:**")
-                        st.write(f"Title: {book_data['title']}")
-                        st.write(f"Author: {book_data['author']}")
-                        st.write(f"Category: {book_data['category']}")
-                        st.write(f"Available: {book_data['availableCopies']}/{book_data['totalCopies']}")
-                    
-                    with col2:
-                        st.write("**Update Book:**")
-                        with st.form("update_book_form"):
-                            new_total = st.number_input("Total Copies", min_value=1, value=int(book_data['totalCopies']))
-                            new_available = st.number_input("Available Copies", min_value=0, max_value=new_total, 
-                                                          value=int(book_data['availableCopies']))
-                            update_submitted = st.form_submit_button("Update Book")
-                            
-                            if update_submitted:
-                                update_data = {
-                                    'totalCopies': new_total,
-                                    'availableCopies': new_available
-                                }
-                                result = api.update_book(book_data['_id'], update_data)
-                                if result and result.get('success'):
-                                    st.markdown('<div class="success-message">✅ Book updated successfully!</div>', unsafe_allow_html=True)
-                                    time.sleep(2)
-                                    st.rerun()
-                    
-                    # Delete option
-                    if st.button("❌ Delete Book", type="secondary"):
-                        if st.warning("Are you sure you want to delete this book?"):
-                            result = api.delete_book(book_data['_id'])
-                            if result and result.get('success'):
-                                st.markdown('<div class="success-message">✅ Book deleted successfully!</div>', unsafe_allow_html=True)
-                                time.sleep(2)
-                                st.rerun()
+        _update_delete_books_tab()
 
 def users_management():
     """Users Management Page"""
-    st.markdown('<div class="sub-header">👥 Users Management</div>', unsafe_allow_html=True)
+    st.markdown(SUBHEADER("👥 Users Management"), unsafe_allow_html=True)
     
     tab1, tab2 = st.tabs(["View Users", "Add New User"])
     
     with tab1:
         st.subheader("All Users")
-        users = api.get_users(limit=100)
-        if users and users.get('success'):
-            df_users = pd.DataFrame(users['data'])
+        df_users = load_cached(users_df)
+        if df_users is not None:
             if not df_users.empty:
                 st.dataframe(df_users, use_container_width=True)
     
@@ -510,301 +868,338 @@ def users_management():
                     
                     result = api.add_user(user_data)
                     if result and result.get('success'):
-                        st.markdown('<div class="success-message">✅ User added successfully!</div>', unsafe_allow_html=True)
-                        time.sleep(2)
+                        flash("✅ User added successfully!")
                         st.rerun()
                 else:
                     st.error("Please fill in all required fields (*)")
 
+@st.fragment
+def _borrow_tab():
+    """Borrow Book tab"""
+    st.subheader("Borrow a Book")
+    
+    # Get available books and users
+    df_books, df_users = parallel_fetch([
+        lambda: load_cached(books_df),
+        lambda: load_cached(users_df)
+    ])
+    
+    if df_books is not None and df_users is not None:
+        # Filter available books
+        available_books = df_books[df_books['availableCopies'] > 0]
+        
+        if not available_books.empty and not df_users.empty:
+            with st.form("borrow_book_form"):
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    book_options = available_books['title'] + " by " + available_books['author']
+                    selected_book = st.selectbox("Select Book*", book_options)
+                    if selected_book:
+                        book_id = available_books[book_options == selected_book]['_id'].iloc[0]
+                        st.info(f"Available copies: {available_books[book_options == selected_book]['availableCopies'].iloc[0]}")
+                
+                with col2:
+                    user_options = df_users['name'] + " (" + df_users['userType'] + ")"
+                    selected_user = st.selectbox("Select User*", user_options)
+                    if selected_user:
+                        user_id = df_users[user_options == selected_user]['_id'].iloc[0]
+                    borrow_days = st.number_input("Borrow Duration (days)", min_value=1, max_value=30, value=14)
+                
+                submitted = st.form_submit_button("Borrow Book")
+                
+                if submitted:
+                    if not selected_book or not selected_user:
+                        st.error("Please select both a book and a user")
+                    else:
+                        with st.spinner("Processing borrow request..."):
+                            result = api.borrow_book(book_id, user_id, borrow_days)
+                            if result and result.get('success'):
+                                flash(f"✅ Book borrowed successfully! Transaction ID: {result['data'].get('transactionId', 'N/A')}")
+                                st.rerun()
+        else:
+            if available_books.empty:
+                st.warning("No available books found. All books are currently borrowed.")
+            if df_users.empty:
+                st.warning("No active users found.")
+
+@st.fragment
+def _return_tab():
+    """Return Book tab"""
+    st.subheader("Return a Book")
+    
+    # Get borrowed transactions
+    transactions = api.get_transactions(status="borrowed", limit=100)
+    if transactions and transactions.get('success'):
+        if transactions['data']:
+            with st.form("return_book_form"):
+                # Build the labels straight from the JSON - this tab never displays a DataFrame
+                transactions_by_label = {}
+                for txn in transactions['data']:
+                    book_title = (txn.get('bookId') or {}).get('title', 'Unknown')
+                    user_name = (txn.get('userId') or {}).get('name', 'Unknown')
+                    label = f"{txn['transactionId']} - {book_title} (User: {user_name}, Due: {txn.get('dueDate', '')})"
+                    transactions_by_label[label] = txn
+                
+                selected_transaction = st.selectbox("Select Transaction to Return*", list(transactions_by_label))
+                transaction_id = transactions_by_label[selected_transaction]['transactionId'] if selected_transaction else ""
+                
+                submitted = st.form_submit_button("Return Book")
+                
+                if submitted:
+                    if not transaction_id:
+                        st.error("Please select a transaction to return")
+                    else:
+                        with st.spinner("Processing return..."):
+                            result = api.return_book(transaction_id)
+                            if result and result.get('success'):
+                                flash("✅ Book returned successfully!")
+                                if result.get('fine'):
+                                    flash(result['fine'], 'warning')
+                                st.rerun()
+        else:
+            st.success("🎉 No borrowed books found - all books are returned!")
+
+@st.fragment
+def _transactions_tab():
+    """View Transactions tab"""
+    st.subheader("All Transactions")
+    
+    status_filter = st.selectbox("Filter by Status", ["", "borrowed", "returned", "overdue"])
+    df_transactions = load_cached(transactions_df, status_filter)
+    
+    if df_transactions is not None:
+        if not df_transactions.empty:
+            # Simplify display
+            display_df = flatten_txn(df_transactions, ['Transaction ID', 'Book', 'User', 'Status',
+                                                       'Borrow Date', 'Due Date', 'Return Date'])
+            st.dataframe(display_df, use_container_width=True)
+
+@st.fragment
+def _overdue_tab():
+    """Overdue Books tab"""
+    st.subheader("Overdue Books")
+    
+    # Overdue days are worked out locally, so loans past due that the backend
+    # hasn't flagged yet show up too
+    df_overdue = load_cached(overdue_df)
+    if df_overdue is not None:
+        if not df_overdue.empty:
+            st.warning(f"🚨 There are {len(df_overdue)} overdue books!")
+            
+            display_df = flatten_txn(df_overdue, ['Transaction ID', 'Book', 'User', 'Due Date', 'Overdue Days'],
+                                     fill_value='N/A')
+            st.dataframe(display_df, use_container_width=True)
+        else:
+            st.success("🎉 No overdue books!")
+
 def transactions_management():
     """Transactions Management Page"""
-    st.markdown('<div class="sub-header">🔄 Transactions Management</div>', unsafe_allow_html=True)
+    st.markdown(SUBHEADER("🔄 Transactions Management"), unsafe_allow_html=True)
     
     tab1, tab2, tab3, tab4 = st.tabs(["Borrow Book", "Return Book", "View Transactions", "Overdue Books"])
     
     with tab1:
-        st.subheader("Borrow a Book")
-        
-        # Get available books and users
-        books = api.get_books(limit=100)
-        users = api.get_users(limit=100)
-        
-        if books and books.get('success') and users and users.get('success'):
-            df_books = pd.DataFrame(books['data'])
-            df_users = pd.DataFrame(users['data'])
-            
-            # Filter available books
-            available_books = df_books[df_books['availableCopies'] > 0]
-            
-            if not available_books.empty and not df_users.empty:
-                with st.form("borrow_book_form"):
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        book_options = available_books['title'] + " by " + available_books['author']
-                        selected_book = st.selectbox("Select Book*", book_options)
-                        if selected_book:
-                            book_id = available_books[book_options == selected_book]['_id'].iloc[0]
-                            st.info(f"Available copies: {available_books[book_options == selected_book]['availableCopies'].iloc[0]}")
-                    
-                    with col2:
-                        user_options = df_users['name'] + " (" + df_users['userType'] + ")"
-                        selected_user = st.selectbox("Select User*", user_options)
-                        if selected_user:
-                            user_id = df_users[user_options == selected_user]['_id'].iloc[0]
-                        borrow_days = st.number_input("Borrow Duration (days)", min_value=1, max_value=30, value=14)
-                    
-                    submitted = st.form_submit_button("Borrow Book")
-                    
-                    if submitted:
-                        if not selected_book or not selected_user:
-                            st.error("Please select both a book and a user")
-                        else:
-                            with st.spinner("Processing borrow request..."):
-                                result = api.borrow_book(book_id, user_id, borrow_days)
-                                if result and result.get('success'):
-                                    st.markdown('<div class="success-message">✅ Book borrowed successfully!</div>', unsafe_allow_html=True)
-                                    st.json(result['data'])  # Show transaction details
-                                    time.sleep(3)
-                                    st.rerun()
-            else:
-                if available_books.empty:
-                    st.warning("No available books found. All books are currently borrowed.")
-                if df_users.empty:
-                    st.warning("No active users found.")
+        _borrow_tab()
     
     with tab2:
-        st.subheader("Return a Book")
-        
-        # Get borrowed transactions
-        transactions = api.get_transactions(status="borrowed", limit=100)
-        if transactions and transactions.get('success'):
-            df_transactions = pd.DataFrame(transactions['data'])
-            if not df_transactions.empty:
-                with st.form("return_book_form"):
-                    transaction_options = []
-                    for _, row in df_transactions.iterrows():
-                        book_title = row['bookId']['title'] if isinstance(row['bookId'], dict) else 'Unknown'
-                        user_name = row['userId']['name'] if isinstance(row['userId'], dict) else 'Unknown'
-                        due_date = row.get('dueDate', '')
-                        transaction_options.append(f"{row['transactionId']} - {book_title} (User: {user_name}, Due: {due_date})")
-                    
-                    selected_transaction = st.selectbox("Select Transaction to Return*", transaction_options)
-                    transaction_id = selected_transaction.split(" - ")[0] if selected_transaction else ""
-                    
-                    submitted = st.form_submit_button("Return Book")
-                    
-                    if submitted:
-                        if not transaction_id:
-                            st.error("Please select a transaction to return")
-                        else:
-                            with st.spinner("Processing return..."):
-                                result = api.return_book(transaction_id)
-                                if result and result.get('success'):
-                                    st.markdown('<div class="success-message">✅ Book returned successfully!</div>', unsafe_allow_html=True)
-                                    if result.get('fine'):
-                                        st.warning(result['fine'])
-                                    time.sleep(3)
-                                    st.rerun()
-            else:
-                st.success("🎉 No borrowed books found - all books are returned!")
+        _return_tab()
     
     with tab3:
-        st.subheader("All Transactions")
-        
-        status_filter = st.selectbox("Filter by Status", ["", "borrowed", "returned", "overdue"])
-        transactions = api.get_transactions(status=status_filter if status_filter else "", limit=100)
-        
-        if transactions and transactions.get('success'):
-            df_transactions = pd.DataFrame(transactions['data'])
-            if not df_transactions.empty:
-                # Simplify display
-                display_data = []
-                for _, row in df_transactions.iterrows():
-                    display_data.append({
-                        'Transaction ID': row['transactionId'],
-                        'Book': row['bookId']['title'] if isinstance(row['bookId'], dict) else 'Unknown',
-                        'User': row['userId']['name'] if isinstance(row['userId'], dict) else 'Unknown',
-                        'Status': row['status'],
-                        'Borrow Date': row['borrowDate'],
-                        'Due Date': row.get('dueDate', ''),
-                        'Return Date': row.get('returnDate', '')
-                    })
-                
-                st.dataframe(pd.DataFrame(display_data), use_container_width=True)
+        _transactions_tab()
     
     with tab4:
-        st.subheader("Overdue Books")
-        
-        overdue = api.get_overdue_transactions()
-        if overdue and overdue.get('success'):
-            df_overdue = pd.DataFrame(overdue['data'])
-            if not df_overdue.empty:
-                st.warning(f"🚨 There are {len(df_overdue)} overdue books!")
-                
-                display_data = []
-                for _, row in df_overdue.iterrows():
-                    display_data.append({
-                        'Transaction ID': row['transactionId'],
-                        'Book': row['bookId']['title'] if isinstance(row['bookId'], dict) else 'Unknown',
-                        'User': row['userId']['name'] if isinstance(row['userId'], dict) else 'Unknown',
-                        'Due Date': row.get('dueDate', ''),
-                        'Overdue Days': row.get('overdueDays', 'N/A')
-                    })
-                
-                st.dataframe(pd.DataFrame(display_data), use_container_width=True)
-            else:
-                st.success("🎉 No overdue books!")
+        _overdue_tab()
 
-def analytics_dashboard():
-    """Analytics Dashboard"""
-    st.markdown('<div class="sub-header">📈 Analytics Dashboard</div>', unsafe_allow_html=True)
+@st.fragment
+def _most_borrowed_tab():
+    """Most Borrowed tab"""
+    import plotly.graph_objects as go
+    st.subheader("Most Borrowed Books")
+    refresh_button('refresh_most_borrowed', _get_most_borrowed)
     
-    tab1, tab2, tab3, tab4 = st.tabs(["Most Borrowed", "User Analysis", "Reading Patterns", "Monthly Report"])
+    # Only the selected view runs, so keep the inputs across switches to other views
+    col1, col2 = st.columns(2)
+    with col1:
+        limit = st.number_input("Number of books", min_value=5, max_value=50,
+                                key=kept_key('most_borrowed_limit', 10))
+    with col2:
+        period = st.selectbox("Time Period", ["all", "week", "month", "year"],
+                              key=kept_key('most_borrowed_period', 'all'))
     
-    with tab1:
-        st.subheader("Most Borrowed Books")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            limit = st.number_input("Number of books", min_value=5, max_value=50, value=10)
-        with col2:
-            period = st.selectbox("Time Period", ["all", "week", "month", "year"])
-        
-        most_borrowed = api.get_most_borrowed(limit=limit, period=period)
-        if most_borrowed and most_borrowed.get('success'):
-            df_most_borrowed = pd.DataFrame(most_borrowed['data'])
-            if not df_most_borrowed.empty:
-                # Check what columns are available and use appropriate ones
-                if 'borrowCount' in df_most_borrowed.columns:
-                    y_column = 'borrowCount'
-                elif 'count' in df_most_borrowed.columns:
-                    y_column = 'count'
-                else:
-                    # If neither exists, use the first numeric column
-                    numeric_columns = df_most_borrowed.select_dtypes(include=['number']).columns
-                    y_column = numeric_columns[0] if len(numeric_columns) > 0 else df_most_borrowed.columns[1]
-                
-                # Bar chart
-                fig = px.bar(df_most_borrowed, x='title', y=y_column, 
-                           title=f'📊 Most Borrowed Books ({period.capitalize()})',
-                           labels={'title': 'Book Title', y_column: 'Borrow Count'})
-                fig.update_layout(xaxis_tickangle=-45)
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Data table
-                st.dataframe(df_most_borrowed, use_container_width=True)
+    most_borrowed = load_cached(_get_most_borrowed, limit, period)
+    if most_borrowed and most_borrowed.get('success'):
+        df_most_borrowed = pd.DataFrame(most_borrowed['data'])
+        if not df_most_borrowed.empty:
+            # Check what columns are available and use appropriate ones
+            if 'borrowCount' in df_most_borrowed.columns:
+                y_column = 'borrowCount'
+            elif 'count' in df_most_borrowed.columns:
+                y_column = 'count'
+            else:
+                # If neither exists, use the first numeric column
+                numeric_columns = df_most_borrowed.select_dtypes(include=['number']).columns
+                y_column = numeric_columns[0] if len(numeric_columns) > 0 else df_most_borrowed.columns[1]
+            
+            # Bar chart
+            fig = go.Figure(go.Bar(x=df_most_borrowed['title'].tolist(), y=df_most_borrowed[y_column].tolist()))
+            fig.update_layout(title=f'📊 Most Borrowed Books ({period.capitalize()})',
+                              xaxis_title='Book Title',
+                              yaxis_title='Borrow Count',
+                              xaxis_tickangle=-45)
+            st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+            
+            # Data table
+            st.dataframe(df_most_borrowed, use_container_width=True)
+
+@st.fragment
+def _user_analysis_tab():
+    """User Analysis tab"""
+    import plotly.graph_objects as go
+    st.subheader("User Category Analysis")
     
-    with tab2:
-        st.subheader("User Category Analysis")
-        
-        user_analysis = api.get_user_categories()
-        if user_analysis and user_analysis.get('success'):
-            df_user_analysis = pd.DataFrame(user_analysis['data'])
-            if not df_user_analysis.empty:
-                # Rename _id to userType for clarity
-                df_user_analysis = df_user_analysis.rename(columns={'_id': 'userType'})
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    # Pie chart - use available columns
-                    value_column = 'totalBorrows' if 'totalBorrows' in df_user_analysis.columns else 'count'
-                    fig_pie = px.pie(df_user_analysis, values=value_column, names='userType',
-                                   title='📊 Borrowing Distribution by User Type')
-                    st.plotly_chart(fig_pie, use_container_width=True)
-                
-                with col2:
-                    # Bar chart
-                    fig_bar = px.bar(df_user_analysis, x='userType', y=value_column,
-                                   title='📈 Total Borrows by User Type',
-                                   color='userType')
-                    st.plotly_chart(fig_bar, use_container_width=True)
+    refresh_button('refresh_user_analysis', _get_user_categories)
+    user_analysis = load_cached(_get_user_categories)
+    if user_analysis and user_analysis.get('success'):
+        df_user_analysis = pd.DataFrame(user_analysis['data'])
+        if not df_user_analysis.empty:
+            # Rename _id to userType for clarity
+            df_user_analysis = df_user_analysis.rename(columns={'_id': 'userType'})
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                # Pie chart - use available columns
+                value_column = 'totalBorrows' if 'totalBorrows' in df_user_analysis.columns else 'count'
+                fig_pie = go.Figure(go.Pie(labels=df_user_analysis['userType'].tolist(),
+                                           values=df_user_analysis[value_column].tolist()))
+                fig_pie.update_layout(title='📊 Borrowing Distribution by User Type')
+                st.plotly_chart(fig_pie, use_container_width=True, config=PLOTLY_CONFIG)
+            
+            with col2:
+                # Bar chart
+                fig_bar = go.Figure(go.Bar(x=df_user_analysis['userType'].tolist(),
+                                           y=df_user_analysis[value_column].tolist(),
+                                           marker_color=category_colors(len(df_user_analysis))))
+                fig_bar.update_layout(title='📈 Total Borrows by User Type')
+                st.plotly_chart(fig_bar, use_container_width=True, config=PLOTLY_CONFIG)
+
+@st.fragment
+def _reading_patterns_tab():
+    """Reading Patterns tab"""
+    import plotly.express as px
+    st.subheader("Reading Patterns")
     
-    with tab3:
-        st.subheader("Reading Patterns")
-        
-        reading_patterns = api.get_reading_patterns()
-        if reading_patterns and reading_patterns.get('success'):
-            df_patterns = pd.DataFrame(reading_patterns['data'])
-            if not df_patterns.empty:
-                # Add month names
-                month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
-                              'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-                df_patterns['Month'] = df_patterns['_id'].apply(lambda x: month_names[x-1] if 1 <= x <= 12 else f'Month {x}')
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    # Use available columns for transactions
-                    transactions_column = 'totalTransactions' if 'totalTransactions' in df_patterns.columns else 'count'
-                    fig_transactions = px.bar(df_patterns, x='Month', y=transactions_column,
-                                            title='📅 Monthly Borrowing Activity')
-                    st.plotly_chart(fig_transactions, use_container_width=True)
-                
-                with col2:
-                    # Use available columns for duration
-                    duration_column = 'averageBorrowDuration' if 'averageBorrowDuration' in df_patterns.columns else 'avgDuration'
-                    if duration_column in df_patterns.columns:
-                        fig_duration = px.line(df_patterns, x='Month', y=duration_column,
-                                             title='⏱️ Average Borrow Duration (Days)')
-                        st.plotly_chart(fig_duration, use_container_width=True)
+    refresh_button('refresh_reading_patterns', reading_patterns_df)
+    df_patterns = load_cached(reading_patterns_df)
+    if df_patterns is not None:
+        if not df_patterns.empty:
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                # Use available columns for transactions, handing plotly only the plotted pair
+                transactions_column = 'totalTransactions' if 'totalTransactions' in df_patterns.columns else 'count'
+                fig_transactions = px.bar(df_patterns[['Month', transactions_column]], x='Month', y=transactions_column,
+                                        title='📅 Monthly Borrowing Activity')
+                fig_transactions = resampled(fig_transactions, len(df_patterns))
+                st.plotly_chart(fig_transactions, use_container_width=True, config=PLOTLY_CONFIG)
+            
+            with col2:
+                # Use available columns for duration
+                duration_column = 'averageBorrowDuration' if 'averageBorrowDuration' in df_patterns.columns else 'avgDuration'
+                if duration_column in df_patterns.columns:
+                    fig_duration = px.line(df_patterns[['Month', duration_column]], x='Month', y=duration_column, render_mode='webgl',
+                                         title='⏱️ Average Borrow Duration (Days)')
+                    fig_duration = resampled(fig_duration, len(df_patterns))
+                    st.plotly_chart(fig_duration, use_container_width=True, config=PLOTLY_CONFIG)
+
+@st.fragment
+def _monthly_report_tab():
+    """Monthly Report tab"""
+    import plotly.graph_objects as go
+    st.subheader("Monthly Report")
     
-    with tab4:
-        st.subheader("Monthly Report")
-        
-        current_year = datetime.now().year
+    # Inside a form the year only takes effect on submit, so browsing the
+    # dropdown doesn't rerun the view
+    current_year = datetime.now().year
+    with st.form('monthly_year_form'):
         selected_year = st.selectbox("Select Year", 
                                    range(current_year-2, current_year+1), 
-                                   index=2)
-        
-        monthly_report = api.get_monthly_report(year=selected_year)
-        if monthly_report and monthly_report.get('success'):
-            df_report = pd.DataFrame(monthly_report['data'])
-            if not df_report.empty:
-                # Add month names
-                month_names = ['January', 'February', 'March', 'April', 'May', 'June',
-                              'July', 'August', 'September', 'October', 'November', 'December']
-                df_report['Month'] = df_report['month'].apply(lambda x: month_names[x-1])
-                
-                # Create comprehensive chart - use available columns
-                fig = go.Figure()
-                
-                # Check which columns are available and add traces accordingly
-                if 'totalBorrows' in df_report.columns:
-                    fig.add_trace(go.Scatter(x=df_report['Month'], y=df_report['totalBorrows'],
+                                   key=kept_key('report_year', current_year))
+        st.form_submit_button("Load report")
+    
+    refresh_button('refresh_monthly_report', monthly_report_df)
+    df_report = load_cached(monthly_report_df, selected_year)
+    if df_report is not None:
+        if not df_report.empty:
+            # Create comprehensive chart - collect the traces for the available columns
+            # and build the figure once rather than validating it on every add_trace.
+            # Traces get plain arrays so no DataFrame goes through plotly's converter
+            months = df_report['Month'].to_numpy()
+            traces = []
+            if 'totalBorrows' in df_report.columns:
+                traces.append(go.Scattergl(x=months, y=df_report['totalBorrows'].to_numpy(),
                                            mode='lines+markers', name='Total Borrows',
                                            line=dict(color='blue', width=3)))
-                
-                if 'totalReturns' in df_report.columns:
-                    fig.add_trace(go.Scatter(x=df_report['Month'], y=df_report['totalReturns'],
+            
+            if 'totalReturns' in df_report.columns:
+                traces.append(go.Scattergl(x=months, y=df_report['totalReturns'].to_numpy(),
                                            mode='lines+markers', name='Total Returns',
                                            line=dict(color='green', width=3)))
-                
-                if 'totalOverdue' in df_report.columns:
-                    fig.add_trace(go.Bar(x=df_report['Month'], y=df_report['totalOverdue'],
-                                       name='Overdue Books', marker_color='red'))
-                
-                fig.update_layout(title=f'📈 Monthly Library Activity - {selected_year}',
-                                xaxis_title='Month',
-                                yaxis_title='Count')
-                
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Display metrics using available columns
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    total_borrows = df_report['totalBorrows'].sum() if 'totalBorrows' in df_report.columns else 0
-                    st.metric("Total Borrows", total_borrows)
-                with col2:
-                    total_returns = df_report['totalReturns'].sum() if 'totalReturns' in df_report.columns else 0
-                    st.metric("Total Returns", total_returns)
-                with col3:
-                    total_overdue = df_report['totalOverdue'].sum() if 'totalOverdue' in df_report.columns else 0
-                    st.metric("Total Overdue", total_overdue)
-                
-                # Detailed table
-                st.dataframe(df_report, use_container_width=True)
+            
+            if 'totalOverdue' in df_report.columns:
+                traces.append(go.Bar(x=months, y=df_report['totalOverdue'].to_numpy(),
+                                     name='Overdue Books', marker_color='red'))
+            
+            fig = go.Figure(data=traces,
+                            layout=go.Layout(title=f'📈 Monthly Library Activity - {selected_year}',
+                                             xaxis_title='Month',
+                                             yaxis_title='Count'))
+            fig = resampled(fig, len(df_report))
+            
+            st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+            
+            # Display metrics using available columns, summed in a single reduction
+            present = [c for c in ('totalBorrows', 'totalReturns', 'totalOverdue') if c in df_report.columns]
+            totals = df_report[present].sum(numeric_only=True)
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Total Borrows", int(totals.get('totalBorrows', 0)))
+            with col2:
+                st.metric("Total Returns", int(totals.get('totalReturns', 0)))
+            with col3:
+                st.metric("Total Overdue", int(totals.get('totalOverdue', 0)))
+            
+            # Detailed table - drop the raw month number and shrink counts before Arrow serialization
+            display_df = df_report.drop(columns=['month'], errors='ignore')
+            for column in display_df.select_dtypes('number').columns:
+                display_df[column] = pd.to_numeric(display_df[column], downcast='integer')
+            st.dataframe(display_df, use_container_width=True, hide_index=True)
+
+def analytics_dashboard():
+    """Analytics Dashboard"""
+    st.markdown(SUBHEADER("📈 Analytics Dashboard"), unsafe_allow_html=True)
+    
+    # st.tabs runs every panel on each rerun, so pick one view and only run that
+    views = {
+        "Most Borrowed": _most_borrowed_tab,
+        "User Analysis": _user_analysis_tab,
+        "Reading Patterns": _reading_patterns_tab,
+        "Monthly Report": _monthly_report_tab
+    }
+    active_tab = st.radio("View", list(views), horizontal=True, key='active_tab',
+                          label_visibility="collapsed")
+    views[active_tab]()
+    
+    # Once the selected view is on screen, warm the caches behind the others
+    # concurrently so switching views is served from cache
+    if cached_check_connection():
+        report_year = st.session_state.get('_kept_report_year', datetime.now().year)
+        parallel_fetch([
+            lambda: load_cached(_get_user_categories),
+            lambda: load_cached(reading_patterns_df),
+            lambda: load_cached(monthly_report_df, report_year)
+        ])
 
 def main():
     """Main application with navigation"""
@@ -812,14 +1207,7 @@ def main():
     # Sidebar navigation
     with st.sidebar:
         # EPCET Logo and Branding with better styling
-        st.markdown(f"""
-        <div style="text-align: center; padding: 1rem 0; background: rgba(255,255,255,0.1); border-radius: 10px; margin-bottom: 1rem;">
-            {EPCET_LOGO}
-            <h2 style="color: white; margin: 0.5rem 0 0 0; font-size: 1.2rem;">EPCET Library</h2>
-            <p style="color: #d0d0d0; font-size: 0.9rem; margin: 0;">Management System</p>
-        </div>
-            
-        """, unsafe_allow_html=True)
+        st.markdown(SIDEBAR_HEADER_HTML, unsafe_allow_html=True)
         
         st.markdown("---")
         
@@ -830,29 +1218,7 @@ def main():
             icons=["house-fill", "book-fill", "people-fill", "arrow-left-right", "graph-up"],
             menu_icon="cast",
             default_index=0,
-            styles={
-                "container": {"padding": "5px", "background-color": "transparent"},
-                "icon": {"color": "white", "font-size": "16px"}, 
-                "nav-link": {
-                    "font-size": "15px",
-                    "text-align": "left",
-                    "margin": "3px",
-                    "color": "white",
-                    "border-radius": "8px",
-                    "padding": "10px 15px"
-                },
-                "nav-link-selected": {
-                    "background-color": "rgba(255, 255, 255, 0.2)",
-                    "color": "white",
-                    "font-weight": "bold",
-                    "border": "1px solid rgba(255, 255, 255, 0.3)"
-                },
-                "menu-title": {
-                    "color": "white",
-                    "font-weight": "bold",
-                    "font-size": "16px"
-                }
-            }
+            styles=NAV_STYLES
         )
         
         st.markdown("---")
@@ -861,9 +1227,10 @@ def main():
         st.markdown("### 🔄 System Status")
         status_container = st.container()
         with status_container:
-            if check_connection():
+            if cached_check_connection():
                 st.success("✅ **Backend Connected**", icon="🔗")
-                health = api.get_health()
+                # Served from the short-lived health cache, not a second request
+                health = load_cached(_get_health)
                 if health:
                     db_status = health['database']['status']
                     db_connected = health['database']['connected']
@@ -881,23 +1248,32 @@ def main():
         col1, col2 = st.columns(2)
         with col1:
             if st.button("🔄 Refresh", use_container_width=True, help="Refresh the page"):
+                # Drop the connection backoff so the rerun probes the backend again
+                st.session_state.pop('_conn', None)
                 st.rerun()
         with col2:
             if st.button("📊 Health", use_container_width=True, help="Check system health"):
-                health = api.get_health()
+                # An explicit check always probes the backend afresh, and its result
+                # replaces the backoff state so the status above and the pages agree
+                _get_health.clear()
+                st.session_state.pop('_conn', None)
+                cached_check_connection()
+                health = load_cached(_get_health)
                 if health:
-                    st.success(f"Status: {health['status']}")
+                    flash(f"Status: {health['status']}")
+                st.rerun()
+        if st.button("🧹 Clear cache", use_container_width=True, help="Discard cached data and reload from the server"):
+            st.cache_data.clear()
+            forget_session_fetches()
+            st.rerun()
         
         st.markdown("---")
         
         # Footer with better styling
-        st.markdown("""
-        <div style="text-align: center; color: #e0e0e0; font-size: 0.8rem; padding: 1rem 0;">
-            <p><strong>EPCET Library Management System</strong></p>
-            <p>Version 2.0</p>
-            <p style="font-size: 0.7rem; color: #b0b0b0;">© 2024 All Rights Reserved</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(SIDEBAR_FOOTER_HTML, unsafe_allow_html=True)
+    
+    # Messages left by the previous run's mutation
+    show_flash()
     
     # Page routing
     if selected == "Dashboard":